@@ -1,10 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi.responses import ORJSONResponse
+from typing import Optional, List, TypedDict
+import os
+import re
 import uvicorn
 
-app = FastAPI(title="Digital Wellness Assistant", version="1.0.0")
+app = FastAPI(
+    title="Digital Wellness Assistant",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,29 +20,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class QueryRequest(BaseModel):
-    user_id: str
-    query: str
-
-class QueryResponse(BaseModel):
+class QueryResponse(TypedDict):
     user_id: str
     query: str
     intent: str
     synthesized_guidance: str
     recommendations: list
 
-@app.get("/health")
-async def health():
-    return {"status": "healthy", "version": "1.0.0"}
+# Each keyword must start a word: "headaches" and "eating" still match, but
+# "great" no longer counts as "eat". Checked in order - the first match wins
+INTENT_PATTERNS = (
+    ("symptom", re.compile(r"\b(?:tired|pain|headache)")),
+    ("diet", re.compile(r"\b(?:food|eat|diet)")),
+    ("fitness", re.compile(r"\b(?:exercise|workout)")),
+)
 
-@app.post("/wellness/query")
-async def wellness_query(request: QueryRequest):
-    query_lower = request.query.lower()
-    
-    # Intent detection & mock responses
-    if any(word in query_lower for word in ["tired", "pain", "headache"]):
-        intent = "symptom"
-        guidance = """
+SYMPTOM_GUIDANCE = """
 ## Symptom Assessment
 **Concern:** {query}
 
@@ -47,11 +46,9 @@ async def wellness_query(request: QueryRequest):
 • Reduce caffeine after 2pm
 
 **Note:** Consult doctor if persists >2 weeks.
-        """.format(query=request.query)
-        recs = ["Hydrate", "Sleep 7-8hrs", "Walk 10min", "Less caffeine"]
-    elif any(word in query_lower for word in ["food", "eat", "diet"]):
-        intent = "diet"
-        guidance = """
+        """
+
+DIET_GUIDANCE = """
 ## Nutrition Guide
 **Question:** {query}
 
@@ -62,11 +59,9 @@ async def wellness_query(request: QueryRequest):
 • Green smoothies
 
 **Hydrate consistently!**
-        """.format(query=request.query)
-        recs = ["Oats+berries", "Nuts+avocado", "Salmon+quinoa", "Green smoothie"]
-    elif any(word in query_lower for word in ["exercise", "workout"]):
-        intent = "fitness"
-        guidance = """
+        """
+
+FITNESS_GUIDANCE = """
 ## Fitness Coach  
 **Goal:** {query}
 
@@ -76,13 +71,11 @@ Week 2: Add squats (3x10)
 Week 3: Add pushups (3x8)
 
 **Safety first - proper form!**
-        """.format(query=request.query)
-        recs = ["20min walk", "Squats 3x10", "Pushups 3x8", "Proper form"]
-    else:
-        intent = "general"
-        guidance = f"""
+        """
+
+GENERAL_GUIDANCE = """
 ## Wellness Guidance
-**Query:** {request.query}
+**Query:** {query}
 
 **Holistic Tips:**
 • Sleep 7-8 hours nightly
@@ -91,15 +84,69 @@ Week 3: Add pushups (3x8)
 • Eat whole foods
 • Practice deep breathing
         """
-        recs = ["Sleep 7-8hrs", "Hydrate", "Walk 20min", "Whole foods"]
+
+# Templates are pre-split around {query} so a response is plain concatenation
+INTENT_RESPONSES = {
+    "symptom": (*SYMPTOM_GUIDANCE.split("{query}"), ["Hydrate", "Sleep 7-8hrs", "Walk 10min", "Less caffeine"]),
+    "diet": (*DIET_GUIDANCE.split("{query}"), ["Oats+berries", "Nuts+avocado", "Salmon+quinoa", "Green smoothie"]),
+    "fitness": (*FITNESS_GUIDANCE.split("{query}"), ["20min walk", "Squats 3x10", "Pushups 3x8", "Proper form"]),
+    "general": (*GENERAL_GUIDANCE.split("{query}"), ["Sleep 7-8hrs", "Hydrate", "Walk 20min", "Whole foods"]),
+}
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy", "version": "1.0.0"}
+
+# OpenAPI schema for the body, which the handler reads and checks itself
+QUERY_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "application/json": {
+            "schema": {
+                "type": "object",
+                "required": ["user_id", "query"],
+                "properties": {
+                    "user_id": {"type": "string"},
+                    "query": {"type": "string"},
+                },
+            }
+        }
+    },
+}
+
+# The body is read as raw JSON and the response returned as a plain dict,
+# skipping Pydantic validation on both sides of this two-field endpoint
+@app.post(
+    "/wellness/query",
+    response_model=None,
+    openapi_extra={"requestBody": QUERY_REQUEST_BODY},
+)
+async def wellness_query(request: Request) -> QueryResponse:
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Request body must be valid JSON")
+
+    user_id = payload.get("user_id") if isinstance(payload, dict) else None
+    query = payload.get("query") if isinstance(payload, dict) else None
+    if not isinstance(user_id, str) or not isinstance(query, str):
+        raise HTTPException(status_code=422, detail="user_id and query must be strings")
+
+    query_lower = query.lower()
     
-    return QueryResponse(
-        user_id=request.user_id,
-        query=request.query,
-        intent=intent,
-        synthesized_guidance=guidance,
-        recommendations=recs
+    # Intent detection & mock responses
+    intent = next(
+        (name for name, pattern in INTENT_PATTERNS if pattern.search(query_lower)), "general"
     )
+    prefix, suffix, recs = INTENT_RESPONSES[intent]
+    
+    return {
+        "user_id": user_id,
+        "query": query,
+        "intent": intent,
+        "synthesized_guidance": prefix + query + suffix,
+        "recommendations": recs,
+    }
 
 @app.get("/")
 async def root():
@@ -109,4 +156,11 @@ async def root():
     }
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Handlers are stateless, so every core can serve its own worker
+    # loop/http are left on "auto": uvloop and httptools are used where installed
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", max(2, os.cpu_count() or 1))),
+    )
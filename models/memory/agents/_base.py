@@ -0,0 +1,211 @@
+"""
+Shared agent runtime - one Groq client and one call path for every agent
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, List, Sequence
+import httpx
+import orjson
+from models.schemas import AgentResult
+from agents._utils import (
+    GROQ_API_KEY,
+    build_messages,
+    extract_recommendations,
+    post_chat_completion,
+    stream_chat_completion,
+)
+
+
+@lru_cache(maxsize=1)
+def _client() -> httpx.AsyncClient:
+    """
+    The one Groq HTTP client every agent and model shares, created on first
+    use so its connection pool (TLS sessions, HTTP/2 streams) is amortized
+    across all agents instead of split per module
+    """
+    return httpx.AsyncClient(
+        base_url="https://api.groq.com/openai/v1",
+        headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    )
+
+
+# Agent configs by intent name, filled in as each agent module is imported
+AGENT_CONFIGS = {}
+
+# Model that answers for several agents at once; it must support JSON mode
+FUSED_MODEL = "llama3-70b-8192"
+
+# Raised by run_agents_fused when the fused reply is unusable or timed out
+FUSED_PARSE_ERRORS = (orjson.JSONDecodeError, ValueError, KeyError)
+
+
+@dataclass(frozen=True, slots=True)
+class AgentConfig:
+    """Everything that differs between one wellness agent and another"""
+    name: str
+    agent_name: str
+    model: str
+    temperature: float
+    confidence: float
+    system_prompt: str
+    min_recommendation_length: int = 1
+
+
+class Agent:
+    """Runs one configured agent against Groq, whole or streamed"""
+
+    def __init__(self, config: AgentConfig):
+        self.config = config
+
+    def _payload(self, query: str, conversation_context: str) -> dict:
+        return {
+            "model": self.config.model,
+            "messages": build_messages(self.config.system_prompt, query, conversation_context),
+            "temperature": self.config.temperature,
+        }
+
+    async def run(self, query: str, conversation_context: str = "") -> AgentResult:
+        """Complete the query and extract recommendations from the response"""
+        try:
+            data = await post_chat_completion(_client(), self._payload(query, conversation_context))
+            choices = data.get("choices", [])
+            content = choices[0]["message"]["content"] if choices else ""
+
+            return AgentResult(
+                success=True,
+                agent_name=self.config.agent_name,
+                content=content,
+                confidence=self.config.confidence,
+                recommendations=extract_recommendations(
+                    content, self.config.min_recommendation_length
+                ),
+            )
+        except Exception as e:
+            return AgentResult(
+                success=False,
+                agent_name=self.config.agent_name,
+                error=str(e),
+            )
+
+    def stream(self, query: str, conversation_context: str = "") -> AsyncIterator[str]:
+        """Stream the response as content deltas while Groq generates it"""
+        return stream_chat_completion(_client(), self._payload(query, conversation_context))
+
+
+def register_agent(config: AgentConfig) -> AgentConfig:
+    """Make an agent config available to get_agent by its name"""
+    AGENT_CONFIGS[config.name] = config
+    return config
+
+
+@lru_cache(maxsize=None)
+def get_agent(name: str) -> Agent:
+    """The single Agent instance for a registered config"""
+    return Agent(AGENT_CONFIGS[name])
+
+
+async def run_agent(name: str, query: str, conversation_context: str = "") -> AgentResult:
+    """Run the named agent to completion"""
+    return await get_agent(name).run(query, conversation_context)
+
+
+def stream_agent(name: str, query: str, conversation_context: str = "") -> AsyncIterator[str]:
+    """Stream the named agent's response as content deltas"""
+    return get_agent(name).stream(query, conversation_context)
+
+
+@lru_cache(maxsize=8)
+def _fused_system_prompt(names: tuple) -> str:
+    """All named agents' instructions, asking for one JSON object keyed by name"""
+    keys = ", ".join(f'"{name}"' for name in names)
+    sections = "\n\n".join(
+        f'### "{name}" - {AGENT_CONFIGS[name].agent_name}\n{AGENT_CONFIGS[name].system_prompt}'
+        for name in names
+    )
+    return (
+        "You are a team of wellness specialists answering the same user message. "
+        f"Reply with a single JSON object with exactly the keys {keys}. Each value "
+        "is a string holding that specialist's complete markdown answer, written "
+        "by following their instructions below.\n\n" + sections
+    )
+
+
+def _fused_reply_unusable(exc: Exception) -> bool:
+    """
+    Timeouts (one completion writing every agent's answer is the likeliest to
+    run long) and Groq's 400 json_validate_failed, where JSON mode produced no
+    valid object, mean the fused reply failed rather than Groq being overloaded
+    """
+    if isinstance(exc, (TimeoutError, httpx.TimeoutException)):
+        return True
+    if not isinstance(exc, httpx.HTTPStatusError) or exc.response.status_code != 400:
+        return False
+    try:
+        error = orjson.loads(exc.response.content).get("error") or {}
+    except (orjson.JSONDecodeError, AttributeError):
+        return False
+    return isinstance(error, dict) and error.get("code") == "json_validate_failed"
+
+
+async def run_agents_fused(
+    names: Sequence[str], query: str, conversation_context: str = ""
+) -> List[AgentResult]:
+    """
+    Answer as several agents with one Groq call in JSON mode and split the
+    reply locally. A call that still fails after the 429/5xx retries comes
+    back as failed results; a reply that can't be split, a JSON-mode
+    validation failure or a timeout raises one of FUSED_PARSE_ERRORS, so the
+    caller can fall back to separate agent calls.
+    """
+    names = tuple(names)
+    configs = [AGENT_CONFIGS[name] for name in names]
+    try:
+        data = await post_chat_completion(
+            _client(),
+            {
+                "model": FUSED_MODEL,
+                "messages": build_messages(_fused_system_prompt(names), query, conversation_context),
+                "temperature": min(config.temperature for config in configs),
+                "response_format": {"type": "json_object"},
+            },
+        )
+    except Exception as e:
+        if _fused_reply_unusable(e):
+            raise ValueError(f"Fused response unusable: {e!r}") from e
+        return [
+            AgentResult(success=False, agent_name=config.agent_name, error=str(e))
+            for config in configs
+        ]
+
+    choices = data.get("choices", [])
+    sections = orjson.loads(choices[0]["message"]["content"]) if choices else {}
+    if not isinstance(sections, dict):
+        raise ValueError("Fused response is not a JSON object")
+
+    results = []
+    for config in configs:
+        content = sections.get(config.name)
+        if not isinstance(content, str) or not content:
+            raise ValueError(f"Fused response has no '{config.name}' section")
+        results.append(
+            AgentResult(
+                success=True,
+                agent_name=config.agent_name,
+                content=content,
+                confidence=config.confidence,
+                recommendations=extract_recommendations(
+                    content, config.min_recommendation_length
+                ),
+            )
+        )
+    return results
+
+
+async def close_client():
+    """Close the pooled Groq HTTP client, if one was ever created"""
+    if _client.cache_info().currsize:
+        await _client().aclose()
+        _client.cache_clear()
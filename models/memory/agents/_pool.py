@@ -0,0 +1,155 @@
+"""
+Per-process worker pool that every Groq completion goes through
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+import httpx
+import orjson
+
+# Payloads are pre-serialized with orjson, so the content type is set by hand
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def estimate_tokens(payload: dict) -> int:
+    """Rough prompt size for rate limiting (~4 characters per token)"""
+    return sum(len(message["content"]) for message in payload.get("messages", ())) // 4 + 1
+
+
+class _TokenBucket:
+    """Refills continuously up to `per_minute`; acquire waits for enough budget"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+
+    async def acquire(self, amount: int = 1):
+        # A single oversized request may drain the bucket but never deadlocks it
+        amount = min(amount, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.available >= amount:
+                self.available -= amount
+                return
+            await asyncio.sleep((amount - self.available) / self.rate)
+
+
+@dataclass(slots=True)
+class LLMWorkItem:
+    """One queued completion request and the future its caller awaits"""
+    client: httpx.AsyncClient
+    payload: dict
+    tokens: int
+    future: asyncio.Future
+
+
+class LLMWorkerPool:
+    """
+    A fixed set of workers draining one FIFO queue of completions, so users
+    are served in arrival order and the request/token budget is enforced in
+    one place. Streams bypass the queue but share the same slots and budget.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        timeout_per_item: float = 30.0,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self.max_workers = max_workers
+        self.timeout_per_item = timeout_per_item
+        self._requests = _TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = _TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._loop = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._workers = []
+
+    def _ensure_started(self):
+        """Start the workers on the running loop (again, if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.max_workers)]
+
+    async def _throttle(self, tokens: int):
+        if self._requests is not None:
+            await self._requests.acquire()
+        if self._tokens is not None:
+            await self._tokens.acquire(tokens)
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                if item.future.done():
+                    continue  # caller gave up while the item was queued
+                await self._throttle(item.tokens)
+                async with self._slots:
+                    async with asyncio.timeout(self.timeout_per_item):
+                        response = await item.client.post(
+                            "/chat/completions",
+                            content=orjson.dumps(item.payload),
+                            headers=JSON_HEADERS,
+                        )
+                        response.raise_for_status()
+                if not item.future.done():
+                    item.future.set_result(orjson.loads(response.content))
+            except Exception as e:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def submit(self, client: httpx.AsyncClient, payload: dict) -> dict:
+        """Queue a chat completion and wait for its decoded JSON response"""
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait(LLMWorkItem(client, payload, estimate_tokens(payload), future))
+        return await future
+
+    @asynccontextmanager
+    async def slot(self, payload: dict):
+        """Hold a worker slot and rate budget for a request made outside the queue"""
+        self._ensure_started()
+        await self._throttle(estimate_tokens(payload))
+        async with self._slots:
+            yield
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def _per_worker(total: Optional[int], workers: int) -> Optional[int]:
+    """This process's share of a budget split across `workers` processes"""
+    return max(1, total // workers) if total else total
+
+
+@lru_cache(maxsize=1)
+def get_pool() -> LLMWorkerPool:
+    """
+    This process's pool, configured from GROQ_* environment variables.
+    GROQ_CONCURRENCY, GROQ_RPM and GROQ_TPM are totals for the deployment;
+    each of the WEB_CONCURRENCY server workers enforces an equal share
+    """
+    workers = max(1, _env_int("WEB_CONCURRENCY") or 1)
+    return LLMWorkerPool(
+        max_workers=_per_worker(int(os.getenv("GROQ_CONCURRENCY", "8")), workers),
+        timeout_per_item=float(os.getenv("GROQ_TIMEOUT", "30")),
+        requests_per_minute=_per_worker(_env_int("GROQ_RPM"), workers),
+        tokens_per_minute=_per_worker(_env_int("GROQ_TPM"), workers),
+    )
@@ -0,0 +1,188 @@
+"""
+Shared helpers for the wellness agents
+"""
+import os
+import re
+import hashlib
+import itertools
+from functools import lru_cache, wraps
+from typing import AsyncIterator
+import httpx
+import orjson
+from cachetools import TTLCache
+from dotenv import load_dotenv
+from models.schemas import AgentResult, ROLE_SYSTEM, ROLE_USER
+from agents._pool import JSON_HEADERS, get_pool
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+# Loaded once for every agent module that imports this one
+load_dotenv()
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+# A bulleted line ("•", "-" or "*"); the group is the text after any run
+# of bullet characters and spaces, without trailing whitespace
+_REC_RE = re.compile(r"^[^\S\n]*[•*-][•*\- ]*(.*?)[^\S\n]*$", re.M)
+
+# Snapshots of successful agent results, keyed by intent + normalized query + context
+_RESPONSE_CACHE = TTLCache(maxsize=10_000, ttl=3600)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries match"""
+    return " ".join(query.lower().split())
+
+
+def extract_recommendations(content: str, min_length: int = 1, limit: int = 5) -> list:
+    """Extract up to `limit` bulleted recommendations of at least `min_length` chars"""
+    recs = (m.group(1) for m in _REC_RE.finditer(content))
+    return list(itertools.islice((rec for rec in recs if len(rec) >= min_length), limit))
+
+
+class RecommendationStream:
+    """
+    Incremental extract_recommendations for streamed content: feed deltas as
+    they arrive and only newline-terminated lines are scanned, so the result
+    is ready as soon as the stream ends without rescanning the full text
+    """
+
+    def __init__(self, min_length: int = 1, limit: int = 5):
+        self.min_length = min_length
+        self.limit = limit
+        self.recommendations = []
+        self._pending = ""
+
+    def _scan(self, segment: str):
+        for match in _REC_RE.finditer(segment):
+            rec = match.group(1)
+            if len(rec) >= self.min_length:
+                self.recommendations.append(rec)
+                if len(self.recommendations) >= self.limit:
+                    return
+
+    def feed(self, delta: str):
+        """Add a content delta, scanning any lines it completes"""
+        if len(self.recommendations) >= self.limit:
+            return
+        self._pending += delta
+        cut = self._pending.rfind("\n") + 1
+        if cut:
+            self._scan(self._pending[:cut])
+            self._pending = self._pending[cut:]
+
+    def finish(self) -> list:
+        """Scan the trailing partial line and return the recommendations"""
+        if self._pending and len(self.recommendations) < self.limit:
+            self._scan(self._pending)
+        self._pending = ""
+        return self.recommendations
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Rate limits and server errors are worth retrying; other failures are not"""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return False
+    status = exc.response.status_code
+    return status == 429 or status >= 500
+
+
+@retry(
+    wait=wait_random_exponential(min=0.5, max=8),
+    stop=stop_after_attempt(6),
+    retry=retry_if_exception(_is_retryable),
+    reraise=True,
+)
+async def post_chat_completion(client: httpx.AsyncClient, payload: dict) -> dict:
+    """
+    Run a chat completion through the shared worker pool, backing off with
+    jitter on 429/5xx. Each retry rejoins the back of the pool's queue.
+    """
+    return await get_pool().submit(client, payload)
+
+
+async def stream_chat_completion(
+    client: httpx.AsyncClient, payload: dict
+) -> AsyncIterator[str]:
+    """
+    Stream a chat completion as content deltas. Holds a worker pool slot for
+    the whole stream and is not retried once tokens have started flowing.
+    """
+    async with get_pool().slot(payload), client.stream(
+        "POST",
+        "/chat/completions",
+        content=orjson.dumps({**payload, "stream": True}),
+        headers=JSON_HEADERS,
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            data = line[len("data: "):]
+            if data == "[DONE]":
+                break
+            choices = orjson.loads(data).get("choices", [])
+            delta = choices[0].get("delta", {}).get("content") if choices else None
+            if delta:
+                yield delta
+
+
+@lru_cache(maxsize=16)
+def _system_message(system_prompt: str) -> dict:
+    return {"role": ROLE_SYSTEM, "content": system_prompt}
+
+
+def build_messages(system_prompt: str, query: str, conversation_context: str = "") -> tuple:
+    """
+    Chat messages in a fixed order: system prompt, optional context, user query.
+    The system prompt always comes first and byte-identical, so Groq can reuse
+    the already-processed prefix across requests instead of prefilling it again.
+    Returned as an immutable tuple; the system dict is cached and shared, so
+    treat it as read-only too.
+    """
+    # First turns have no context, so that case is checked first
+    if not conversation_context:
+        return (_system_message(system_prompt), {"role": ROLE_USER, "content": query})
+    return (
+        _system_message(system_prompt),
+        {"role": ROLE_SYSTEM, "content": "Previous context:\n" + conversation_context},
+        {"role": ROLE_USER, "content": query},
+    )
+
+
+def cache_agent_response(intent: str):
+    """
+    Decorate an agent call so repeats of the same (intent, query, context)
+    are answered from cache instead of another Groq round-trip
+    """
+    def decorator(agent_call):
+        @wraps(agent_call)
+        async def wrapper(query: str, conversation_context: str = ""):
+            key = hashlib.blake2b(
+                "\0".join((intent, normalize_query(query), conversation_context)).encode(),
+                digest_size=16,
+            ).hexdigest()
+            cached = _RESPONSE_CACHE.get(key)
+            if cached is not None:
+                agent_name, content, confidence, recommendations = cached
+                return AgentResult(
+                    success=True,
+                    agent_name=agent_name,
+                    content=content,
+                    confidence=confidence,
+                    recommendations=list(recommendations),
+                )
+
+            result = await agent_call(query, conversation_context)
+            if result.success:
+                # An immutable snapshot, so callers can't alter what later hits see
+                _RESPONSE_CACHE[key] = (
+                    result.agent_name,
+                    result.content,
+                    result.confidence,
+                    tuple(result.recommendations),
+                )
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,23 +1,15 @@
 """
 Fitness and exercise agent - GROK VERSION
 """
-from langchain import create_agent
-from langchain_groq import ChatGroq
-import os
-from dotenv import load_dotenv
+from typing import AsyncIterator
+from models.schemas import AgentResult
+from agents._base import AgentConfig, register_agent, run_agent, stream_agent
 
-load_dotenv()
+MODEL_NAME = "llama3-70b-8192"
+TEMPERATURE = 0.4
+MIN_RECOMMENDATION_LENGTH = 9
 
-
-def create_fitness_agent():
-    """Create fitness and exercise agent with GROK"""
-    model = ChatGroq(
-        groq_api_key=os.getenv("GROQ_API_KEY"),
-        model_name="llama3-70b-8192",
-        temperature=0.4,
-    )
-
-    system_prompt = """You are a fitness wellness coach providing general exercise guidance. Your expertise:
+SYSTEM_PROMPT = """You are a fitness wellness coach providing general exercise guidance. Your expertise:
 1. Exercise principles and benefits
 2. Beginner-friendly workout suggestions
 3. Injury prevention strategies
@@ -39,54 +31,22 @@ Format responses as:
 - Form tips and modifications
 """
 
-    agent = create_agent(
-        model=model,
-        tools=[],
-        system_prompt=system_prompt,
-    )
-
-    return agent
+register_agent(AgentConfig(
+    name="fitness",
+    agent_name="Fitness Coach",
+    model=MODEL_NAME,
+    temperature=TEMPERATURE,
+    confidence=0.81,
+    system_prompt=SYSTEM_PROMPT,
+    min_recommendation_length=MIN_RECOMMENDATION_LENGTH,
+))
 
 
-async def provide_fitness_guidance(query: str, conversation_context: str = "") -> dict:
+async def provide_fitness_guidance(query: str, conversation_context: str = "") -> AgentResult:
     """Provide fitness guidance"""
-    agent = create_fitness_agent()
-
-    messages = []
-    if conversation_context:
-        messages.append({"role": "system", "content": f"Previous context:\n{conversation_context}"})
-    
-    messages.append({"role": "user", "content": query})
-
-    try:
-        response = await agent.ainvoke({"messages": messages})
-        content = response.get("messages", [])[-1].content if response.get("messages") else ""
-        
-        return {
-            "success": True,
-            "agent_name": "Fitness Coach",
-            "content": content,
-            "confidence": 0.81,
-            "recommendations": extract_recommendations(content),
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "agent_name": "Fitness Coach",
-        }
+    return await run_agent("fitness", query, conversation_context)
 
 
-def extract_recommendations(content: str) -> list:
-    """Extract fitness recommendations"""
-    recommendations = []
-    lines = content.split("\n")
-    
-    for line in lines:
-        line = line.strip()
-        if line and (line.startswith("•") or line.startswith("-") or line.startswith("*")):
-            rec = line.lstrip("•-* ")
-            if rec and len(rec) > 8:
-                recommendations.append(rec)
-    
-    return recommendations[:5]
\ No newline at end of file
+def stream_fitness_guidance(query: str, conversation_context: str = "") -> AsyncIterator[str]:
+    """Stream fitness guidance as content deltas while Groq generates it"""
+    return stream_agent("fitness", query, conversation_context)
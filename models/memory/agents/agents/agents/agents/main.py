@@ -3,21 +3,37 @@ Digital Wellness Assistant - COMPLETE MAIN.PY (GROK VERSION)
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
+from contextlib import asynccontextmanager
 import os
+import re
+import orjson
 import logging
 from dotenv import load_dotenv
+# Importing the agent modules registers their configs with agents._base
+from agents import symptom_agent, lifestyle_agent, diet_agent, fitness_agent  # noqa: F401
+from agents._base import AGENT_CONFIGS, close_client, stream_agent
+from agents._utils import RecommendationStream
+from safety import detect_emergency
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled Groq connections on shutdown
+    await close_client()
+
 app = FastAPI(
     title="Digital Wellness Assistant",
     description="Multi-agent wellness guidance system (GROK)",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -30,57 +46,74 @@ app.add_middleware(
 
 # Simple mock orchestrator/synthesizer (replace with real ones later)
 class MockOrchestrator:
+    # One compiled alternation per intent, checked in priority order
+    INTENT_PATTERNS = (
+        ("symptom", re.compile(r"tired|pain|headache|sick")),
+        ("lifestyle", re.compile(r"sleep|stress|routine")),
+        ("diet", re.compile(r"food|eat|diet")),
+        ("fitness", re.compile(r"exercise|workout|gym")),
+    )
+
+    # Canned agent responses: (agent_name, content template, confidence, recommendations)
+    MOCK_RESPONSES = {
+        "symptom": (
+            "Symptom Assessment",
+            "## Symptom Assessment\n\n**Your concern:** {q}\n\n**Analysis:** Fatigue can be caused by poor sleep, dehydration, or stress.\n\n**Recommendations:**\n• Drink 8-10 glasses of water daily\n• Aim for 7-8 hours of quality sleep\n• Take 10-minute walks daily\n• Practice deep breathing exercises\n\n**When to seek help:** If fatigue persists >2 weeks or worsens.",
+            0.85,
+            ("Drink 8-10 glasses water", "7-8 hours sleep", "10-min walks", "Deep breathing"),
+        ),
+        "diet": (
+            "Nutrition Guide",
+            "## Nutrition Guidance\n\n**Your question:** {q}\n\n**Recommendations:**\n• Eat complex carbs (oats, sweet potatoes, quinoa)\n• Include healthy fats (avocado, nuts, olive oil)\n• Protein sources (eggs, fish, legumes)\n• Leafy greens and colorful vegetables\n• Stay hydrated throughout day\n\n**Sample meal:** Oatmeal + berries + nuts breakfast.",
+            0.80,
+            ("Complex carbs", "Healthy fats", "Quality protein", "Leafy greens", "Stay hydrated"),
+        ),
+        "fitness": (
+            "Fitness Coach",
+            "## Fitness Guidance\n\n**Your question:** {q}\n\n**Beginner Plan:**\n• **Week 1:** 20-min brisk walking daily\n• **Week 2:** Add bodyweight squats (3x10)\n• **Week 3:** Add push-ups (knee version, 3x8)\n\n**Safety:** Start slow, proper form, stop if pain.\n**Progress:** Increase time/reps gradually.",
+            0.81,
+            ("20-min walks", "Bodyweight squats", "Knee push-ups", "Proper form first"),
+        ),
+        "general": (
+            "Lifestyle Coach",
+            "## General Wellness\n\n**Query:** {q}\n\n**Holistic Approach:**\n• Prioritize sleep hygiene\n• Stay consistently hydrated\n• Move body daily (even walking)\n• Practice stress management\n• Eat whole nutrient-dense foods",
+            0.75,
+            ("Sleep hygiene", "Hydration", "Daily movement", "Stress management", "Whole foods"),
+        ),
+    }
+
+    # First trigger word found in the query picks the canned response
+    RESPONSE_TRIGGERS = (
+        ("tired", "symptom"),
+        ("food", "diet"),
+        ("eat", "diet"),
+        ("exercise", "fitness"),
+    )
+
     def process_wellness_query(self, query):
         return {
             "user_id": query["user_id"],
             "query": query["query"],
-            "intent": self.detect_intent(query["query"]),
-            "agent_responses": self.get_agent_responses(query["query"]),
+            "intent": self.detect_intent(query["query_lower"]),
+            "agent_responses": self.get_agent_responses(query["query"], query["query_lower"]),
             "agent_count": 1
         }
     
-    def detect_intent(self, query):
-        query_lower = query.lower()
-        if any(word in query_lower for word in ["tired", "pain", "headache", "sick"]):
-            return "symptom"
-        elif any(word in query_lower for word in ["sleep", "stress", "routine"]):
-            return "lifestyle"
-        elif any(word in query_lower for word in ["food", "eat", "diet"]):
-            return "diet"
-        elif any(word in query_lower for word in ["exercise", "workout", "gym"]):
-            return "fitness"
+    def detect_intent(self, query_lower):
+        for intent, pattern in self.INTENT_PATTERNS:
+            if pattern.search(query_lower):
+                return intent
         return "general"
     
-    def get_agent_responses(self, query):
-        query_lower = query.lower()
-        if "tired" in query_lower:
-            return [{
-                "agent_name": "Symptom Assessment",
-                "content": "## Symptom Assessment\n\n**Your concern:** " + query + "\n\n**Analysis:** Fatigue can be caused by poor sleep, dehydration, or stress.\n\n**Recommendations:**\n• Drink 8-10 glasses of water daily\n• Aim for 7-8 hours of quality sleep\n• Take 10-minute walks daily\n• Practice deep breathing exercises\n\n**When to seek help:** If fatigue persists >2 weeks or worsens.",
-                "confidence": 0.85,
-                "recommendations": ["Drink 8-10 glasses water", "7-8 hours sleep", "10-min walks", "Deep breathing"]
-            }]
-        elif "food" in query_lower or "eat" in query_lower:
-            return [{
-                "agent_name": "Nutrition Guide",
-                "content": "## Nutrition Guidance\n\n**Your question:** " + query + "\n\n**Recommendations:**\n• Eat complex carbs (oats, sweet potatoes, quinoa)\n• Include healthy fats (avocado, nuts, olive oil)\n• Protein sources (eggs, fish, legumes)\n• Leafy greens and colorful vegetables\n• Stay hydrated throughout day\n\n**Sample meal:** Oatmeal + berries + nuts breakfast.",
-                "confidence": 0.80,
-                "recommendations": ["Complex carbs", "Healthy fats", "Quality protein", "Leafy greens", "Stay hydrated"]
-            }]
-        elif "exercise" in query_lower:
-            return [{
-                "agent_name": "Fitness Coach",
-                "content": "## Fitness Guidance\n\n**Your question:** " + query + "\n\n**Beginner Plan:**\n• **Week 1:** 20-min brisk walking daily\n• **Week 2:** Add bodyweight squats (3x10)\n• **Week 3:** Add push-ups (knee version, 3x8)\n\n**Safety:** Start slow, proper form, stop if pain.\n**Progress:** Increase time/reps gradually.",
-                "confidence": 0.81,
-                "recommendations": ["20-min walks", "Bodyweight squats", "Knee push-ups", "Proper form first"]
-            }]
-        else:
-            return [{
-                "agent_name": "Lifestyle Coach",
-                "content": "## General Wellness\n\n**Query:** " + query + "\n\n**Holistic Approach:**\n• Prioritize sleep hygiene\n• Stay consistently hydrated\n• Move body daily (even walking)\n• Practice stress management\n• Eat whole nutrient-dense foods",
-                "confidence": 0.75,
-                "recommendations": ["Sleep hygiene", "Hydration", "Daily movement", "Stress management", "Whole foods"]
-            }]
+    def get_agent_responses(self, query, query_lower):
+        key = next((key for word, key in self.RESPONSE_TRIGGERS if word in query_lower), "general")
+        agent_name, template, confidence, recommendations = self.MOCK_RESPONSES[key]
+        return [{
+            "agent_name": agent_name,
+            "content": template.format_map({"q": query}),
+            "confidence": confidence,
+            "recommendations": recommendations
+        }]
 
 orchestrator = MockOrchestrator()
 
@@ -114,14 +147,18 @@ async def health_check():
         agents_available=4
     )
 
+# The mock orchestrator is blocking, CPU-bound work, so this route is a plain
+# `def` and Starlette runs it in its threadpool. Any endpoint that calls
+# blocking code must either be sync like this or wrap the call in
+# `await asyncio.to_thread(...)` so it never stalls the event loop.
 @app.post("/wellness/query", response_model=QueryResponse)
-async def wellness_query(request: QueryRequest):
+def wellness_query(request: QueryRequest):
     try:
         logger.info(f"Processing query from {request.user_id}: {request.query[:50]}...")
+        query_lower = request.query.lower()
         
         # Check for emergency keywords
-        emergency_keywords = ["chest pain", "can't breathe", "suicidal"]
-        if any(keyword in request.query.lower() for keyword in emergency_keywords):
+        if detect_emergency(query_lower):
             return QueryResponse(
                 user_id=request.user_id,
                 query=request.query,
@@ -137,7 +174,8 @@ async def wellness_query(request: QueryRequest):
         # Process query
         result = orchestrator.process_wellness_query({
             "user_id": request.user_id,
-            "query": request.query
+            "query": request.query,
+            "query_lower": query_lower
         })
         
         # Synthesize response
@@ -158,6 +196,43 @@ async def wellness_query(request: QueryRequest):
         logger.error(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(payload: dict) -> bytes:
+    """Format one Server-Sent Events frame"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+@app.post("/wellness/{intent}/stream")
+async def stream_wellness_query(intent: str, request: QueryRequest):
+    """Stream one agent's guidance as SSE: delta frames, then a final done frame"""
+    config = AGENT_CONFIGS.get(intent)
+    if config is None:
+        raise HTTPException(status_code=404, detail=f"No streaming agent for intent '{intent}'")
+    logger.info(f"Streaming {intent} query from {request.user_id}: {request.query[:50]}...")
+
+    async def events():
+        if detect_emergency(request.query.lower()):
+            yield _sse({
+                "warning": "EMERGENCY REQUIRED",
+                "content": "🚨 CRITICAL: Seek emergency medical help immediately (911)",
+                "requires_emergency": True,
+                "done": True,
+            })
+            return
+
+        # Recommendations are picked out line by line as the deltas arrive
+        recommendations = RecommendationStream(config.min_recommendation_length)
+        try:
+            async for delta in stream_agent(intent, request.query):
+                recommendations.feed(delta)
+                yield _sse({"delta": delta})
+        except Exception as e:
+            logger.error(f"Error: {str(e)}")
+            yield _sse({"error": str(e), "done": True})
+            return
+
+        yield _sse({"done": True, "recommendations": recommendations.finish()})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.get("/wellness/intents")
 async def get_intents():
     return {"intents": ["symptom", "lifestyle", "diet", "fitness", "general"]}
@@ -171,6 +246,7 @@ async def root():
         "endpoints": {
             "health": "/health",
             "query": "/wellness/query (POST)",
+            "stream": "/wellness/{intent}/stream (POST, SSE)",
             "intents": "/wellness/intents",
             "docs": "/docs"
         },
@@ -179,4 +255,14 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
+    workers = int(os.getenv("WEB_CONCURRENCY", max(2, os.cpu_count() or 1)))
+    # Workers inherit this, so each one's Groq pool takes its share of GROQ_*
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    # loop/http are left on "auto": uvloop and httptools are used where installed
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        log_level="info",
+        workers=workers,
+    )
@@ -2,14 +2,51 @@
 Agent orchestrator - routes queries to appropriate agents and manages execution
 """
 import asyncio
+import inspect
+import os
 from typing import Optional, List
-from models.schemas import WellnessQuery, IntentType, AgentResponse, UserProfile
+import ahocorasick
+import msgspec
+from models.schemas import WellnessQuery, IntentType, AgentResponse, AgentResult, UserProfile
 from memory.short_memory import MemoryManager
+from memory.redis_memory import RedisMemoryManager
 from agents.symptom_agent import assess_symptoms
 from agents.lifestyle_agent import analyze_lifestyle
 from agents.diet_agent import provide_nutrition_guidance
 from agents.fitness_agent import provide_fitness_guidance
+from agents._base import FUSED_PARSE_ERRORS, run_agents_fused
+from safety import detect_emergency
 
+# Intent scores live in a flat list indexed by position in IntentType
+_INTENT_ORDER = tuple(IntentType)
+_INTENT_IDX = {intent: idx for idx, intent in enumerate(_INTENT_ORDER)}
+
+
+async def run_all_agents(query: str, conversation_context: str = "") -> List[AgentResult]:
+    """
+    Answer as the nutrition, lifestyle and symptom agents in one fused Groq
+    call, falling back to running them concurrently only if its reply can't
+    be split (a failed call is not retried a second time per agent)
+    """
+    try:
+        return await run_agents_fused(("diet", "lifestyle", "symptom"), query, conversation_context)
+    except FUSED_PARSE_ERRORS as e:
+        print(f"Fused agent reply unusable, running agents separately: {e}")
+
+    agents = (
+        ("Nutrition Guide", provide_nutrition_guidance),
+        ("Lifestyle Coach", analyze_lifestyle),
+        ("Symptom Assessment", assess_symptoms),
+    )
+    results = await asyncio.gather(
+        *(agent_call(query, conversation_context) for _, agent_call in agents),
+        return_exceptions=True,
+    )
+    return [
+        result if isinstance(result, AgentResult)
+        else AgentResult(success=False, agent_name=agent_name, error=str(result))
+        for (agent_name, _), result in zip(agents, results)
+    ]
 
 class WellnessOrchestrator:
     """
@@ -17,7 +54,12 @@ class WellnessOrchestrator:
     """
 
     def __init__(self):
-        self.memory_manager = MemoryManager()
+        redis_url = os.getenv("REDIS_URL")
+        self.memory_manager = (
+            RedisMemoryManager.from_url(redis_url) if redis_url else MemoryManager()
+        )
+        self.max_concurrent_agents = 4
+        self._inflight = {}
         self.intent_keywords = {
             IntentType.SYMPTOM: [
                 "symptom", "ache", "pain", "tired", "fatigue", "sick", 
@@ -41,92 +83,169 @@ class WellnessOrchestrator:
             ],
         }
 
-    def identify_intent(self, query: str) -> IntentType:
+        # Keywords can belong to several intents ("tired", "fatigue"),
+        # so each automaton value carries every intent index for that keyword
+        keyword_intents = {}
+        for intent, keywords in self.intent_keywords.items():
+            for keyword in keywords:
+                keyword_intents.setdefault(keyword, []).append(_INTENT_IDX[intent])
+
+        self._intent_automaton = ahocorasick.Automaton()
+        for keyword, intent_idxs in keyword_intents.items():
+            self._intent_automaton.add_word(keyword, (keyword, tuple(intent_idxs)))
+        self._intent_automaton.make_automaton()
+
+    def identify_intent(self, query_lower: str) -> IntentType:
         """
-        Identify the primary intent of user query
+        Identify the primary intent of the lowercased user query
         """
-        query_lower = query.lower()
-        intent_scores = {intent: 0 for intent in IntentType}
+        scores = [0] * len(_INTENT_ORDER)
+        matched = set()
 
-        for intent, keywords in self.intent_keywords.items():
-            for keyword in keywords:
-                if keyword in query_lower:
-                    intent_scores[intent] += 1
+        for _, (keyword, intent_idxs) in self._intent_automaton.iter(query_lower):
+            if keyword in matched:
+                continue
+            matched.add(keyword)
+            for idx in intent_idxs:
+                scores[idx] += 1
 
-        max_intent = max(intent_scores, key=intent_scores.get)
+        best = max(range(len(scores)), key=scores.__getitem__)
         
-        if intent_scores[max_intent] == 0:
+        if scores[best] == 0:
             return IntentType.GENERAL
         
-        return max_intent
+        return _INTENT_ORDER[best]
 
     async def execute_agent_query(
         self,
         wellness_query: WellnessQuery,
+        query_lower: Optional[str] = None,
     ) -> List[AgentResponse]:
         """
         Execute queries across relevant agents
         """
+        if query_lower is None:
+            query_lower = wellness_query.query.lower()
+
+        # Classification is a microsecond automaton scan, so it runs inline
         if not wellness_query.intent:
-            wellness_query.intent = self.identify_intent(wellness_query.query)
+            wellness_query.intent = self.identify_intent(query_lower)
+        context = await self._memory_call(
+            self.memory_manager.get_conversation_context,
+            wellness_query.user_id,
+        )
 
-        context = self.memory_manager.get_conversation_context(wellness_query.user_id)
+        # Identical questions already in flight share one agent fan-out.
+        # Context is part of the key so answers never cross conversations.
+        key = (
+            wellness_query.intent,
+            " ".join(query_lower.split()),
+            context,
+        )
+        fan_out = self._inflight.get(key)
+        if fan_out is None:
+            fan_out = asyncio.create_task(
+                self._fan_out(wellness_query.intent, wellness_query.query, context)
+            )
+            self._inflight[key] = fan_out
+            fan_out.add_done_callback(lambda _: self._inflight.pop(key, None))
 
-        agent_tasks = []
-        
-        if wellness_query.intent == IntentType.SYMPTOM:
-            agent_tasks.append(assess_symptoms(wellness_query.query, context))
-        elif wellness_query.intent == IntentType.LIFESTYLE:
-            agent_tasks.append(analyze_lifestyle(wellness_query.query, context))
-        elif wellness_query.intent == IntentType.DIET:
-            agent_tasks.append(provide_nutrition_guidance(wellness_query.query, context))
-        elif wellness_query.intent == IntentType.FITNESS:
-            agent_tasks.append(provide_fitness_guidance(wellness_query.query, context))
+        # Shielded so one caller going away doesn't cancel the others' result
+        agent_responses = list(await asyncio.shield(fan_out))
+
+        await self._memory_call(
+            self.memory_manager.add_user_message,
+            wellness_query.user_id,
+            wellness_query.query,
+        )
+
+        return agent_responses
+
+    async def _fan_out(
+        self, intent: IntentType, query: str, context: str
+    ) -> List[AgentResponse]:
+        """
+        Run every agent relevant to the intent and collect successful responses
+        """
+        if intent == IntentType.SYMPTOM:
+            agent_calls = [assess_symptoms]
+        elif intent == IntentType.LIFESTYLE:
+            agent_calls = [analyze_lifestyle]
+        elif intent == IntentType.DIET:
+            agent_calls = [provide_nutrition_guidance]
+        elif intent == IntentType.FITNESS:
+            agent_calls = [provide_fitness_guidance]
         else:
-            agent_tasks = [
-                assess_symptoms(wellness_query.query, context),
-                analyze_lifestyle(wellness_query.query, context),
-                provide_nutrition_guidance(wellness_query.query, context),
-                provide_fitness_guidance(wellness_query.query, context),
+            agent_calls = [
+                assess_symptoms,
+                analyze_lifestyle,
+                provide_nutrition_guidance,
+                provide_fitness_guidance,
             ]
 
-        try:
-            results = await asyncio.gather(*agent_tasks, return_exceptions=True)
-        except Exception as e:
-            print(f"Error executing agent tasks: {e}")
-            results = []
+        results = None
+        if intent == IntentType.GENERAL:
+            # Every agent answers a general query, so ask for all of them at once
+            try:
+                results = await run_agents_fused(
+                    ("symptom", "lifestyle", "diet", "fitness"), query, context
+                )
+            except FUSED_PARSE_ERRORS as e:
+                print(f"Fused agent reply unusable, running agents separately: {e}")
+
+        if results is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_agents)
+            async with asyncio.TaskGroup() as tg:
+                agent_tasks = [
+                    tg.create_task(self._run_agent(agent_call, semaphore, query, context))
+                    for agent_call in agent_calls
+                ]
+            results = [task.result() for task in agent_tasks]
 
         agent_responses = []
         for result in results:
-            if isinstance(result, dict) and result.get("success"):
+            if isinstance(result, AgentResult) and result.success:
                 agent_responses.append(
                     AgentResponse(
-                        agent_name=result.get("agent_name", "Unknown"),
-                        content=result.get("content", ""),
-                        confidence=result.get("confidence", 0.7),
-                        recommendations=result.get("recommendations", []),
+                        agent_name=result.agent_name,
+                        content=result.content,
+                        confidence=result.confidence,
+                        recommendations=result.recommendations,
                     )
                 )
 
-        self.memory_manager.add_user_message(wellness_query.user_id, wellness_query.query)
-
         return agent_responses
 
-    def filter_intent_safety(self, intent: IntentType, query: str) -> tuple:
+    async def _memory_call(self, method, *args):
+        """
+        Call a memory manager method: awaited for the async Redis backend,
+        called inline for the in-process store, whose operations are quick
+        dict updates that would cost less than a thread hop
+        """
+        if inspect.iscoroutinefunction(method):
+            return await method(*args)
+        return method(*args)
+
+    async def _run_agent(self, agent_call, semaphore, query: str, context: str):
+        """
+        Run a single agent under the fan-out semaphore, isolating its failures
+        """
+        async with semaphore:
+            try:
+                return await agent_call(query, context)
+            except Exception as e:
+                print(f"Error executing agent task: {e}")
+                return None
+
+    def filter_intent_safety(self, intent: IntentType, query_lower: str) -> tuple:
         """
         Safety filter for specific intents
         """
         warning_message = ""
         
-        critical_symptoms = [
-            "chest pain", "difficulty breathing", "severe bleeding",
-            "loss of consciousness", "seizure", "suicidal", "harm"
-        ]
-        
         if intent == IntentType.SYMPTOM:
-            for symptom in critical_symptoms:
-                if symptom in query.lower():
-                    return False, f"CRITICAL: Seek emergency medical care immediately (911)"
+            if detect_emergency(query_lower):
+                return False, f"CRITICAL: Seek emergency medical care immediately (911)"
         
         return True, warning_message
 
@@ -137,10 +256,12 @@ class WellnessOrchestrator:
         """
         Complete workflow to process user query
         """
-        intent = self.identify_intent(wellness_query.query)
+        # Lowercased once here and shared by every keyword scan below
+        query_lower = wellness_query.query.lower()
+        intent = self.identify_intent(query_lower)
         wellness_query.intent = intent
 
-        is_safe, warning = self.filter_intent_safety(intent, wellness_query.query)
+        is_safe, warning = self.filter_intent_safety(intent, query_lower)
         
         if not is_safe:
             return {
@@ -154,28 +275,20 @@ class WellnessOrchestrator:
                 "requires_emergency": True,
             }
 
-        agent_responses = await self.execute_agent_query(wellness_query)
+        agent_responses = await self.execute_agent_query(wellness_query, query_lower)
 
         return {
             "user_id": wellness_query.user_id,
             "query": wellness_query.query,
             "intent": intent.value,
-            "agent_responses": [
-                {
-                    "agent_name": resp.agent_name,
-                    "content": resp.content,
-                    "confidence": resp.confidence,
-                    "recommendations": resp.recommendations,
-                }
-                for resp in agent_responses
-            ],
+            "agent_responses": [msgspec.structs.asdict(resp) for resp in agent_responses],
             "agent_count": len(agent_responses),
         }
 
-    def get_user_memory_context(self, user_id: str) -> dict:
+    async def get_user_memory_context(self, user_id: str) -> dict:
         """Get user's conversation memory and context"""
-        return self.memory_manager.get_memory_stats(user_id)
+        return await self._memory_call(self.memory_manager.get_memory_stats, user_id)
 
-    def clear_user_memory(self, user_id: str):
+    async def clear_user_memory(self, user_id: str):
         """Clear user's conversation history"""
-        self.memory_manager.clear_memory(user_id)
\ No newline at end of file
+        await self._memory_call(self.memory_manager.clear_memory, user_id)
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""
+Emergency detection shared by the API layer and the orchestrator
+"""
+from typing import Optional
+import ahocorasick
+
+EMERGENCY_KEYWORDS = (
+    "chest pain", "can't breathe", "difficulty breathing", "severe bleeding",
+    "loss of consciousness", "seizure", "suicidal",
+    "harm myself", "self-harm", "self harm",
+)
+
+_EMERGENCY_AUTOMATON = ahocorasick.Automaton()
+for _keyword in EMERGENCY_KEYWORDS:
+    _EMERGENCY_AUTOMATON.add_word(_keyword, _keyword)
+_EMERGENCY_AUTOMATON.make_automaton()
+
+
+def detect_emergency(query_lower: str) -> Optional[str]:
+    """Return the first emergency keyword in the lowercased query, or None"""
+    for end, keyword in _EMERGENCY_AUTOMATON.iter(query_lower):
+        # Hits must start a word, so "unharmed" or "charm" never count
+        start = end - len(keyword) + 1
+        if start == 0 or not query_lower[start - 1].isalnum():
+            return keyword
+    return None
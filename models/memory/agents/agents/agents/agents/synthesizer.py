@@ -1,7 +1,7 @@
 """
 Response synthesizer - combines agent responses into coherent guidance
 """
-from typing import List
+from typing import List, Optional
 from models.schemas import AgentResponse, WellnessResponse, IntentType
 import textwrap
 
@@ -14,6 +14,7 @@ class ResponseSynthesizer:
     def __init__(self):
         self.max_recommendation_length = 100
         self.min_confidence_threshold = 0.65
+        self._wrap80 = textwrap.TextWrapper(width=80).fill
 
     def synthesize_responses(
         self,
@@ -77,30 +78,39 @@ class ResponseSynthesizer:
         else:
             return self._synthesize_general_response(responses, query)
 
+    @staticmethod
+    def _preview(
+        response: Optional[AgentResponse], limit: int, fallback: str = ""
+    ) -> str:
+        """Truncated agent content for previews, or fallback if no response"""
+        if response is None:
+            return fallback
+        return response.content[:limit] + "..."
+
     def _synthesize_symptom_response(
         self, responses: List[AgentResponse], query: str
     ) -> str:
         """Synthesize symptom-related guidance"""
         primary = responses[0] if responses else None
         
-        synthesis = f"""
+        parts = [f"""
 ## Symptom Assessment
 
 **Your concern:** {query}
 
 **Initial Assessment:**
-{textwrap.fill(primary.content[:300] + "..." if primary else "Unable to assess.", width=80)}
+{self._wrap80(self._preview(primary, 300, "Unable to assess."))}
 
 **Key Recommendations:**
-"""
+"""]
         if primary and primary.recommendations:
             for i, rec in enumerate(primary.recommendations[:4], 1):
-                synthesis += f"\n{i}. {rec}"
+                parts.append(f"\n{i}. {rec}")
         
-        synthesis += "\n\n**Important Note:**\n"
-        synthesis += "This is general wellness perspective. If symptoms persist, worsen, or are severe, please consult a healthcare provider.\n"
+        parts.append("\n\n**Important Note:**\n")
+        parts.append("This is general wellness perspective. If symptoms persist, worsen, or are severe, please consult a healthcare provider.\n")
         
-        return synthesis
+        return "".join(parts)
 
     def _synthesize_lifestyle_response(
         self, responses: List[AgentResponse], query: str
@@ -108,24 +118,24 @@ class ResponseSynthesizer:
         """Synthesize lifestyle guidance"""
         primary = responses[0] if responses else None
         
-        synthesis = f"""
+        parts = [f"""
 ## Lifestyle & Wellness Guidance
 
 **Your question:** {query}
 
 **Recommended Approach:**
-{textwrap.fill(primary.content[:250] + "..." if primary else "Unable to provide guidance.", width=80)}
+{self._wrap80(self._preview(primary, 250, "Unable to provide guidance."))}
 
 **Action Items:**
-"""
+"""]
         if primary and primary.recommendations:
             for i, rec in enumerate(primary.recommendations[:5], 1):
-                synthesis += f"\n• {rec}"
+                parts.append(f"\n• {rec}")
         
-        synthesis += "\n\n**Implementation Strategy:**\n"
-        synthesis += "Start with 1-2 recommendations that resonate most with you. Build momentum gradually.\n"
+        parts.append("\n\n**Implementation Strategy:**\n")
+        parts.append("Start with 1-2 recommendations that resonate most with you. Build momentum gradually.\n")
         
-        return synthesis
+        return "".join(parts)
 
     def _synthesize_diet_response(
         self, responses: List[AgentResponse], query: str
@@ -133,24 +143,24 @@ class ResponseSynthesizer:
         """Synthesize nutrition guidance"""
         primary = responses[0] if responses else None
         
-        synthesis = f"""
+        parts = [f"""
 ## Nutrition & Diet Guidance
 
 **Your question:** {query}
 
 **Nutritional Perspective:**
-{textwrap.fill(primary.content[:250] + "..." if primary else "No nutrition guidance available.", width=80)}
+{self._wrap80(self._preview(primary, 250, "No nutrition guidance available."))}
 
 **Food Suggestions:**
-"""
+"""]
         if primary and primary.recommendations:
             for i, rec in enumerate(primary.recommendations[:5], 1):
-                synthesis += f"\n• {rec}"
+                parts.append(f"\n• {rec}")
         
-        synthesis += "\n\n**Dietary Note:**\n"
-        synthesis += "For specific medical dietary needs, consult a registered dietitian.\n"
+        parts.append("\n\n**Dietary Note:**\n")
+        parts.append("For specific medical dietary needs, consult a registered dietitian.\n")
         
-        return synthesis
+        return "".join(parts)
 
     def _synthesize_fitness_response(
         self, responses: List[AgentResponse], query: str
@@ -158,47 +168,47 @@ class ResponseSynthesizer:
         """Synthesize fitness guidance"""
         primary = responses[0] if responses else None
         
-        synthesis = f"""
+        parts = [f"""
 ## Fitness & Exercise Guidance
 
 **Your question:** {query}
 
 **Exercise Recommendation:**
-{textwrap.fill(primary.content[:250] + "..." if primary else "No exercise guidance available.", width=80)}
+{self._wrap80(self._preview(primary, 250, "No exercise guidance available."))}
 
 **Suggested Activities:**
-"""
+"""]
         if primary and primary.recommendations:
             for i, rec in enumerate(primary.recommendations[:5], 1):
-                synthesis += f"\n• {rec}"
+                parts.append(f"\n• {rec}")
         
-        synthesis += "\n\n**Safety Note:**\n"
-        synthesis += "Start gradually and listen to your body. Stop if you experience pain. Consult healthcare provider before starting new programs.\n"
+        parts.append("\n\n**Safety Note:**\n")
+        parts.append("Start gradually and listen to your body. Stop if you experience pain. Consult healthcare provider before starting new programs.\n")
         
-        return synthesis
+        return "".join(parts)
 
     def _synthesize_general_response(
         self, responses: List[AgentResponse], query: str
     ) -> str:
         """Synthesize general/multi-intent response"""
-        synthesis = f"""
+        parts = [f"""
 ## Comprehensive Wellness Perspective
 
 **Your question:** {query}
 
 **Multi-Dimensional Assessment:**
-"""
+"""]
         for response in responses[:4]:
             if response.confidence > 0.7:
-                synthesis += f"\n\n**{response.agent_name}:**\n"
-                synthesis += textwrap.fill(response.content[:200] + "...", width=80)
+                parts.append(f"\n\n**{response.agent_name}:**\n")
+                parts.append(self._wrap80(self._preview(response, 200)))
         
-        synthesis += "\n\n**Integrated Recommendations:**\n"
+        parts.append("\n\n**Integrated Recommendations:**\n")
         all_recs = self._extract_unified_recommendations(responses, limit=6)
         for i, rec in enumerate(all_recs, 1):
-            synthesis += f"\n{i}. {rec}"
+            parts.append(f"\n{i}. {rec}")
         
-        return synthesis
+        return "".join(parts)
 
     def _extract_unified_recommendations(
         self, responses: List[AgentResponse], limit: int = 5
@@ -206,17 +216,18 @@ class ResponseSynthesizer:
         """
         Extract and deduplicate recommendations from multiple agents
         """
-        all_recs = []
-        seen = set()
+        # Insertion-ordered dict doubles as the dedup set and the result list
+        seen = {}
         
         for response in responses:
             for rec in response.recommendations:
                 rec_lower = rec.lower()[:50]
                 if rec_lower not in seen:
-                    all_recs.append(rec)
-                    seen.add(rec_lower)
+                    seen[rec_lower] = rec
+                    if len(seen) >= limit:
+                        return list(seen.values())
         
-        return all_recs[:limit]
+        return list(seen.values())
 
     def _get_fallback_guidance(self, intent: IntentType) -> str:
         """Get fallback guidance when agents don't respond"""
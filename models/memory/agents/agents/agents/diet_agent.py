@@ -1,23 +1,16 @@
 """
 Nutrition and diet agent - GROK VERSION
 """
-from langchain import create_agent
-from langchain_groq import ChatGroq
-import os
-from dotenv import load_dotenv
+from typing import AsyncIterator
+from models.schemas import AgentResult
+from agents._base import AgentConfig, register_agent, run_agent, stream_agent
+from agents._utils import cache_agent_response
 
-load_dotenv()
+MODEL_NAME = "mixtral-8x7b-32768"
+TEMPERATURE = 0.3
+MIN_RECOMMENDATION_LENGTH = 9
 
-
-def create_diet_agent():
-    """Create nutrition and diet agent with GROK"""
-    model = ChatGroq(
-        groq_api_key=os.getenv("GROQ_API_KEY"),
-        model_name="mixtral-8x7b-32768",
-        temperature=0.3,
-    )
-
-    system_prompt = """You are a wellness nutritionist specializing in general dietary guidance. Your role:
+SYSTEM_PROMPT = """You are a wellness nutritionist specializing in general dietary guidance. Your role:
 1. Provide balanced nutrition information
 2. Suggest nutrient-rich foods for specific goals
 3. Explain dietary principles
@@ -37,54 +30,23 @@ Format responses as:
 - Implementation strategy
 """
 
-    agent = create_agent(
-        model=model,
-        tools=[],
-        system_prompt=system_prompt,
-    )
-
-    return agent
+register_agent(AgentConfig(
+    name="diet",
+    agent_name="Nutrition Guide",
+    model=MODEL_NAME,
+    temperature=TEMPERATURE,
+    confidence=0.80,
+    system_prompt=SYSTEM_PROMPT,
+    min_recommendation_length=MIN_RECOMMENDATION_LENGTH,
+))
 
 
-async def provide_nutrition_guidance(query: str, conversation_context: str = "") -> dict:
+@cache_agent_response("diet")
+async def provide_nutrition_guidance(query: str, conversation_context: str = "") -> AgentResult:
     """Provide nutritional guidance"""
-    agent = create_diet_agent()
-
-    messages = []
-    if conversation_context:
-        messages.append({"role": "system", "content": f"Previous context:\n{conversation_context}"})
-    
-    messages.append({"role": "user", "content": query})
-
-    try:
-        response = await agent.ainvoke({"messages": messages})
-        content = response.get("messages", [])[-1].content if response.get("messages") else ""
-        
-        return {
-            "success": True,
-            "agent_name": "Nutrition Guide",
-            "content": content,
-            "confidence": 0.80,
-            "recommendations": extract_recommendations(content),
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "agent_name": "Nutrition Guide",
-        }
+    return await run_agent("diet", query, conversation_context)
 
 
-def extract_recommendations(content: str) -> list:
-    """Extract nutrition recommendations"""
-    recommendations = []
-    lines = content.split("\n")
-    
-    for line in lines:
-        line = line.strip()
-        if line and (line.startswith("•") or line.startswith("-") or line.startswith("*")):
-            rec = line.lstrip("•-* ")
-            if rec and len(rec) > 8:
-                recommendations.append(rec)
-    
-    return recommendations[:5]
\ No newline at end of file
+def stream_nutrition_guidance(query: str, conversation_context: str = "") -> AsyncIterator[str]:
+    """Stream nutrition guidance as content deltas while Groq generates it"""
+    return stream_agent("diet", query, conversation_context)
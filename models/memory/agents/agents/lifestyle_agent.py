@@ -1,23 +1,16 @@
 """
 Lifestyle and wellness habits agent - GROK VERSION
 """
-from langchain import create_agent
-from langchain_groq import ChatGroq
-import os
-from dotenv import load_dotenv
+from typing import AsyncIterator
+from models.schemas import AgentResult
+from agents._base import AgentConfig, register_agent, run_agent, stream_agent
+from agents._utils import cache_agent_response
 
-load_dotenv()
+MODEL_NAME = "llama3-70b-8192"
+TEMPERATURE = 0.4
+MIN_RECOMMENDATION_LENGTH = 11
 
-
-def create_lifestyle_agent():
-    """Create lifestyle wellness agent with GROK"""
-    model = ChatGroq(
-        groq_api_key=os.getenv("GROQ_API_KEY"),
-        model_name="llama3-70b-8192",
-        temperature=0.4,
-    )
-
-    system_prompt = """You are a lifestyle and wellness habits coach. Your expertise includes:
+SYSTEM_PROMPT = """You are a lifestyle and wellness habits coach. Your expertise includes:
 1. Sleep hygiene and quality rest
 2. Stress management techniques
 3. Daily routine optimization
@@ -36,54 +29,23 @@ Format as:
 - Implementation tips (3-5 specific actions)
 """
 
-    agent = create_agent(
-        model=model,
-        tools=[],
-        system_prompt=system_prompt,
-    )
-
-    return agent
+register_agent(AgentConfig(
+    name="lifestyle",
+    agent_name="Lifestyle Coach",
+    model=MODEL_NAME,
+    temperature=TEMPERATURE,
+    confidence=0.82,
+    system_prompt=SYSTEM_PROMPT,
+    min_recommendation_length=MIN_RECOMMENDATION_LENGTH,
+))
 
 
-async def analyze_lifestyle(query: str, conversation_context: str = "") -> dict:
+@cache_agent_response("lifestyle")
+async def analyze_lifestyle(query: str, conversation_context: str = "") -> AgentResult:
     """Analyze lifestyle and provide recommendations"""
-    agent = create_lifestyle_agent()
-
-    messages = []
-    if conversation_context:
-        messages.append({"role": "system", "content": f"Previous context:\n{conversation_context}"})
-    
-    messages.append({"role": "user", "content": query})
-
-    try:
-        response = await agent.ainvoke({"messages": messages})
-        content = response.get("messages", [])[-1].content if response.get("messages") else ""
-        
-        return {
-            "success": True,
-            "agent_name": "Lifestyle Coach",
-            "content": content,
-            "confidence": 0.82,
-            "recommendations": extract_recommendations(content),
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "agent_name": "Lifestyle Coach",
-        }
+    return await run_agent("lifestyle", query, conversation_context)
 
 
-def extract_recommendations(content: str) -> list:
-    """Extract actionable recommendations"""
-    recommendations = []
-    lines = content.split("\n")
-    
-    for line in lines:
-        line = line.strip()
-        if line and (line.startswith("•") or line.startswith("-") or line.startswith("*")):
-            rec = line.lstrip("•-* ")
-            if rec and len(rec) > 10:
-                recommendations.append(rec)
-    
-    return recommendations[:5]
\ No newline at end of file
+def stream_lifestyle_analysis(query: str, conversation_context: str = "") -> AsyncIterator[str]:
+    """Stream lifestyle guidance as content deltas while Groq generates it"""
+    return stream_agent("lifestyle", query, conversation_context)
@@ -1,23 +1,16 @@
 """
 Symptom assessment agent - GROK VERSION
 """
-from langchain import create_agent
-from langchain_groq import ChatGroq
-import os
-from dotenv import load_dotenv
+from typing import AsyncIterator
+from models.schemas import AgentResult
+from agents._base import AgentConfig, register_agent, run_agent, stream_agent
+from agents._utils import cache_agent_response
 
-load_dotenv()
+MODEL_NAME = "mixtral-8x7b-32768"
+TEMPERATURE = 0.3
+MIN_RECOMMENDATION_LENGTH = 1
 
-
-def create_symptom_agent():
-    """Create symptom assessment agent with GROK"""
-    model = ChatGroq(
-        groq_api_key=os.getenv("GROQ_API_KEY"),
-        model_name="mixtral-8x7b-32768",
-        temperature=0.3,
-    )
-
-    system_prompt = """You are a wellness symptom assessment specialist. Your role is to:
+SYSTEM_PROMPT = """You are a wellness symptom assessment specialist. Your role is to:
 1. Understand the user's reported symptoms
 2. Ask clarifying questions if needed
 3. Provide general wellness suggestions
@@ -32,52 +25,23 @@ Format your response with:
 Always emphasize: "This is general wellness guidance, not medical advice."
 """
 
-    agent = create_agent(
-        model=model,
-        tools=[],
-        system_prompt=system_prompt,
-    )
-
-    return agent
+register_agent(AgentConfig(
+    name="symptom",
+    agent_name="Symptom Assessment",
+    model=MODEL_NAME,
+    temperature=TEMPERATURE,
+    confidence=0.85,
+    system_prompt=SYSTEM_PROMPT,
+    min_recommendation_length=MIN_RECOMMENDATION_LENGTH,
+))
 
 
-async def assess_symptoms(query: str, conversation_context: str = "") -> dict:
+@cache_agent_response("symptom")
+async def assess_symptoms(query: str, conversation_context: str = "") -> AgentResult:
     """Assess user symptoms"""
-    agent = create_symptom_agent()
-
-    messages = []
-    if conversation_context:
-        messages.append({"role": "system", "content": f"Previous context:\n{conversation_context}"})
-    
-    messages.append({"role": "user", "content": query})
-
-    try:
-        response = await agent.ainvoke({"messages": messages})
-        content = response.get("messages", [])[-1].content if response.get("messages") else ""
-        
-        return {
-            "success": True,
-            "agent_name": "Symptom Assessment",
-            "content": content,
-            "confidence": 0.85,
-            "recommendations": extract_recommendations(content),
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "agent_name": "Symptom Assessment",
-        }
+    return await run_agent("symptom", query, conversation_context)
 
 
-def extract_recommendations(content: str) -> list:
-    """Extract recommendations from agent response"""
-    recommendations = []
-    lines = content.split("\n")
-    
-    for line in lines:
-        line = line.strip()
-        if line.startswith("•") or line.startswith("-") or line.startswith("*"):
-            recommendations.append(line.lstrip("•-* "))
-    
-    return recommendations[:5]
\ No newline at end of file
+def stream_symptom_assessment(query: str, conversation_context: str = "") -> AsyncIterator[str]:
+    """Stream symptom assessment as content deltas while Groq generates it"""
+    return stream_agent("symptom", query, conversation_context)
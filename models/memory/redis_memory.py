@@ -0,0 +1,106 @@
+"""
+Redis-backed conversation memory shared across workers and restarts
+"""
+import msgpack
+from redis.asyncio import ConnectionPool, Redis
+from models.schemas import ConversationMemory, Msg, ROLE_ASSISTANT, ROLE_USER
+
+
+class RedisMemoryManager:
+    """
+    Async counterpart of MemoryManager. Each user's messages are a Redis list
+    trimmed to the last `max_messages` (msgpack-encoded [role, content]) and
+    their context is a hash; both expire after `ttl_seconds` of inactivity
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl_seconds: int = 3600,
+        key_prefix: str = "ctx:",
+        max_messages: int = 20,
+    ):
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.max_messages = max_messages
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisMemoryManager":
+        """Create a manager backed by a pooled connection to the given URL"""
+        return cls(Redis(connection_pool=ConnectionPool.from_url(url)), **kwargs)
+
+    def _keys(self, user_id: str) -> tuple:
+        """Message list key and context hash key for a user"""
+        prefix = f"{self.key_prefix}{user_id}"
+        return f"{prefix}:messages", f"{prefix}:context"
+
+    async def _add_message(self, user_id: str, role: str, message: str):
+        """Append, trim and refresh TTLs in a single round-trip"""
+        messages_key, context_key = self._keys(user_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.rpush(messages_key, msgpack.packb((role, message)))
+        pipe.ltrim(messages_key, -self.max_messages, -1)
+        pipe.expire(messages_key, self.ttl_seconds)
+        pipe.expire(context_key, self.ttl_seconds)
+        await pipe.execute()
+
+    async def get_or_create_memory(self, user_id: str) -> ConversationMemory:
+        """Load stored memory, or an empty one for a new user"""
+        messages_key, context_key = self._keys(user_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.lrange(messages_key, 0, -1)
+        pipe.hgetall(context_key)
+        raw_messages, raw_context = await pipe.execute()
+        return ConversationMemory(
+            user_id=user_id,
+            messages=[Msg(*msgpack.unpackb(raw)) for raw in raw_messages],
+            context={key.decode(): msgpack.unpackb(value) for key, value in raw_context.items()},
+            max_messages=self.max_messages,
+        )
+
+    async def add_user_message(self, user_id: str, message: str):
+        """Add user message to memory"""
+        await self._add_message(user_id, ROLE_USER, message)
+
+    async def add_assistant_message(self, user_id: str, message: str):
+        """Add assistant response to memory"""
+        await self._add_message(user_id, ROLE_ASSISTANT, message)
+
+    async def get_conversation_context(self, user_id: str) -> str:
+        """Get formatted conversation context"""
+        messages_key, _ = self._keys(user_id)
+        recent = await self.redis.lrange(messages_key, -5, -1)
+        return "\n".join(
+            f"{role}: {content}" for role, content in map(msgpack.unpackb, recent)
+        )
+
+    async def update_user_context(self, user_id: str, context: dict):
+        """Update user context information"""
+        if not context:
+            return
+        messages_key, context_key = self._keys(user_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(context_key, mapping={key: msgpack.packb(value) for key, value in context.items()})
+        pipe.expire(context_key, self.ttl_seconds)
+        pipe.expire(messages_key, self.ttl_seconds)
+        await pipe.execute()
+
+    async def clear_memory(self, user_id: str):
+        """Clear user memory"""
+        await self.redis.delete(*self._keys(user_id))
+
+    async def get_memory_stats(self, user_id: str) -> dict:
+        """Get memory statistics"""
+        messages_key, context_key = self._keys(user_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.llen(messages_key)
+        pipe.hkeys(context_key)
+        pipe.lindex(messages_key, -1)
+        message_count, context_keys, last = await pipe.execute()
+        return {
+            "user_id": user_id,
+            "message_count": message_count,
+            "context_keys": [key.decode() for key in context_keys],
+            "last_message": Msg(*msgpack.unpackb(last)).to_dict() if last else None,
+        }
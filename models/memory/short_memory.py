@@ -1,57 +1,91 @@
 """
 Short-term memory management for user conversations
 """
-from typing import Dict
-from models.schemas import ConversationMemory
+import threading
+from collections import OrderedDict
+from models.schemas import ConversationMemory, ROLE_ASSISTANT, ROLE_USER
+
+# Per-user locks are striped so users rarely contend and the lock count is fixed
+_LOCK_STRIPES = 64
 
 
 class MemoryManager:
-    """Manages conversation memory for users"""
+    """Manages conversation memory for users, evicting the least recently used"""
 
     def __init__(self, max_users: int = 100):
-        self.memory_store: Dict[str, ConversationMemory] = {}
+        self.memory_store: OrderedDict[str, ConversationMemory] = OrderedDict()
         self.max_users = max_users
+        # Callers may share one manager across threads. A user's stripe lock is
+        # held from lookup through mutation, and eviction skips users whose
+        # stripe is busy, so a write can never land in an evicted memory.
+        # Lock order is always stripe lock, then store lock.
+        self._store_lock = threading.Lock()
+        self._user_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        return self._user_locks[hash(user_id) % _LOCK_STRIPES]
+
+    def _evict_one(self):
+        """Drop the least recently used user not in use; store lock must be held"""
+        for victim in self.memory_store:
+            victim_lock = self._user_lock(victim)
+            if victim_lock.acquire(blocking=False):
+                try:
+                    del self.memory_store[victim]
+                finally:
+                    victim_lock.release()
+                return
+        # Every stored user is mid-update; go briefly over max_users instead
+
+    def _lookup(self, user_id: str) -> ConversationMemory:
+        """Get or create memory; the caller holds this user's stripe lock"""
+        with self._store_lock:
+            memory = self.memory_store.get(user_id)
+            if memory is not None:
+                self.memory_store.move_to_end(user_id)
+                return memory
+
+            if len(self.memory_store) >= self.max_users:
+                self._evict_one()
+            memory = ConversationMemory(user_id=user_id)
+            self.memory_store[user_id] = memory
+            return memory
+
+    def _mutate(self, user_id: str, fn):
+        """Run fn on the user's memory with lookup and update in one critical section"""
+        with self._user_lock(user_id):
+            return fn(self._lookup(user_id))
 
     def get_or_create_memory(self, user_id: str) -> ConversationMemory:
         """Get existing memory or create new one"""
-        if user_id not in self.memory_store:
-            if len(self.memory_store) >= self.max_users:
-                oldest_key = next(iter(self.memory_store))
-                del self.memory_store[oldest_key]
-            self.memory_store[user_id] = ConversationMemory(user_id=user_id)
-        return self.memory_store[user_id]
+        return self._mutate(user_id, lambda memory: memory)
 
     def add_user_message(self, user_id: str, message: str):
         """Add user message to memory"""
-        memory = self.get_or_create_memory(user_id)
-        memory.add_message("user", message)
+        self._mutate(user_id, lambda memory: memory.add_message(ROLE_USER, message))
 
     def add_assistant_message(self, user_id: str, message: str):
         """Add assistant response to memory"""
-        memory = self.get_or_create_memory(user_id)
-        memory.add_message("assistant", message)
+        self._mutate(user_id, lambda memory: memory.add_message(ROLE_ASSISTANT, message))
 
     def get_conversation_context(self, user_id: str) -> str:
         """Get formatted conversation context"""
-        memory = self.get_or_create_memory(user_id)
-        return memory.get_context()
+        return self._mutate(user_id, lambda memory: memory.get_context())
 
     def update_user_context(self, user_id: str, context: dict):
         """Update user context information"""
-        memory = self.get_or_create_memory(user_id)
-        memory.context.update(context)
+        self._mutate(user_id, lambda memory: memory.context.update(context))
 
     def clear_memory(self, user_id: str):
         """Clear user memory"""
-        if user_id in self.memory_store:
-            del self.memory_store[user_id]
+        with self._user_lock(user_id), self._store_lock:
+            self.memory_store.pop(user_id, None)
 
     def get_memory_stats(self, user_id: str) -> dict:
         """Get memory statistics"""
-        memory = self.get_or_create_memory(user_id)
-        return {
+        return self._mutate(user_id, lambda memory: {
             "user_id": user_id,
             "message_count": len(memory.messages),
             "context_keys": list(memory.context.keys()),
-            "last_message": memory.messages[-1] if memory.messages else None,
-        }
\ No newline at end of file
+            "last_message": memory.messages[-1].to_dict() if memory.messages else None,
+        })
@@ -1,10 +1,20 @@
 """
 Data models and schemas for wellness assistant
 """
-from pydantic import BaseModel, Field
-from typing import Optional, List
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+import msgspec
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer, model_validator
+from typing import Annotated, Deque, Optional, List
 from enum import Enum
 
+# Interned so every stored message shares one copy of each role string
+ROLE_USER = sys.intern("user")
+ROLE_ASSISTANT = sys.intern("assistant")
+ROLE_SYSTEM = sys.intern("system")
+
 
 class IntentType(str, Enum):
     """Wellness intent categories"""
@@ -15,16 +25,19 @@ class IntentType(str, Enum):
     GENERAL = "general"
 
 
-class UserProfile(BaseModel):
+# Per-request schemas are msgspec Structs: slotted, cheap to construct, and
+# type-checked when decoded with msgspec.json.decode / msgspec.convert
+
+class UserProfile(msgspec.Struct):
     """User profile for context"""
     user_id: str
     age: Optional[int] = None
     gender: Optional[str] = None
-    health_conditions: List[str] = Field(default_factory=list)
-    preferences: dict = Field(default_factory=dict)
+    health_conditions: List[str] = []
+    preferences: dict = {}
 
 
-class WellnessQuery(BaseModel):
+class WellnessQuery(msgspec.Struct):
     """Input query structure"""
     user_id: str
     query: str
@@ -32,15 +45,42 @@ class WellnessQuery(BaseModel):
     user_profile: Optional[UserProfile] = None
 
 
-class AgentResponse(BaseModel):
+class AgentResponse(msgspec.Struct, frozen=True):
     """Individual agent response"""
     agent_name: str
     content: str
-    confidence: float = Field(default=0.8, ge=0.0, le=1.0)
-    recommendations: List[str] = Field(default_factory=list)
+    confidence: Annotated[float, msgspec.Meta(ge=0.0, le=1.0)] = 0.8
+    recommendations: List[str] = []
+
+    def __post_init__(self):
+        # Meta bounds only apply when decoding, so direct construction checks here
+        if not 0.0 <= self.confidence <= 1.0:
+            raise ValueError(f"confidence must be between 0 and 1, got {self.confidence}")
+
+
+@dataclass(slots=True)
+class AgentResult:
+    """Raw result returned by an agent call, before validation"""
+    success: bool
+    agent_name: str
+    content: str = ""
+    confidence: float = 0.7
+    recommendations: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Msg:
+    """Single conversation message kept in memory"""
+    role: str
+    content: str
 
+    def to_dict(self) -> dict:
+        """Message in the chat-completions wire format"""
+        return {"role": self.role, "content": self.content}
 
-class WellnessResponse(BaseModel):
+
+class WellnessResponse(msgspec.Struct):
     """Final synthesized response"""
     user_id: str
     query: str
@@ -54,19 +94,34 @@ class WellnessResponse(BaseModel):
 class ConversationMemory(BaseModel):
     """Short-term memory for conversation"""
     user_id: str
-    messages: List[dict] = Field(default_factory=list)
+    messages: Deque[Msg] = Field(default_factory=deque)
     context: dict = Field(default_factory=dict)
     max_messages: int = 20
+    # Bumped on every append; get_context reuses its string until it changes
+    _version: int = PrivateAttr(default=0)
+    _ctx_cache: Optional[tuple] = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _bound_messages(self) -> "ConversationMemory":
+        """Keep messages in a bounded deque so appends trim in O(1)"""
+        self.messages = deque(self.messages, maxlen=self.max_messages)
+        return self
+
+    @field_serializer("messages")
+    def _dump_messages(self, messages: Deque[Msg]) -> List[dict]:
+        """Dump messages as plain dicts for JSON/msgpack consumers"""
+        return [msg.to_dict() for msg in messages]
 
     def add_message(self, role: str, content: str):
         """Add message to memory"""
-        self.messages.append({"role": role, "content": content})
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages:]
+        self.messages.append(Msg(sys.intern(role), content))
+        self._version += 1
 
     def get_context(self) -> str:
         """Get formatted context for agents"""
-        formatted = []
-        for msg in self.messages[-5:]:
-            formatted.append(f"{msg['role']}: {msg['content']}")
-        return "\n".join(formatted)
\ No newline at end of file
+        if self._ctx_cache is not None and self._ctx_cache[0] == self._version:
+            return self._ctx_cache[1]
+        recent = islice(self.messages, max(len(self.messages) - 5, 0), None)
+        context = "\n".join(f"{msg.role}: {msg.content}" for msg in recent)
+        self._ctx_cache = (self._version, context)
+        return context
\ No newline at end of file